@@ -1,9 +1,12 @@
 import pandas as pd
-import numpy as np
 import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
+import altair as alt
 import os
+import tempfile
+
+from leave_days import working_days
 
 # Sample leave application data
 datafile = "employee_leave_2025.xlsx"
@@ -13,47 +16,120 @@ if not os.path.exists(datafile):
     st.error("Error: The file 'employee_leave_2025.xlsx' was not found.")
     st.stop()  # Stop execution if file is missing
 
-# Convert to DataFrame
-leave_df = pd.read_excel(datafile)
-
 # Ensure required columns exist
 required_columns = {'Employee_Name', 'Start_Date', 'End_Date', 'Reason'}
-if not required_columns.issubset(leave_df.columns):
-    st.error(f"Error: Missing required columns: {required_columns - set(leave_df.columns)}")
-    st.stop()
 
-# Convert dates to datetime
-leave_df['Start_Date'] = pd.to_datetime(leave_df['Start_Date'])
-leave_df['End_Date'] = pd.to_datetime(leave_df['End_Date'])
-
-# Calculate working days (Monday-Friday)
-leave_df['Working Days'] = leave_df.apply(lambda row: np.busday_count(row['Start_Date'].date(), row['End_Date'].date()), axis=1)
-
-
-# Calculate Leave Duration in Days
-leave_df['Leave_Duration'] = leave_df.apply(
-    lambda row: np.busday_count(row['Start_Date'].date(), row['End_Date'].date()) + 1,
-    axis=1)
-
-# Extract Month Name from Start_Date
-leave_df['Month_Name'] = leave_df['Start_Date'].dt.strftime('%B')
+# Declared column types so the readers skip inference; Parquet keeps them natively
+leave_dtypes = {'Employee_Name': 'category', 'Reason': 'category'}
+date_columns = ['Start_Date', 'End_Date']
 
 # Define month order for sorting
 month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
                'July', 'August', 'September', 'October', 'November', 'December']
 
-# Convert Month_Name column to categorical
-leave_df['Month_Name'] = pd.Categorical(leave_df['Month_Name'], categories=month_order, ordered=True)
+# Month number -> name, applied only when a table or chart is rendered
+month_names = dict(enumerate(month_order, start=1))
+
+def write_sidecar(df, parquet_path):
+    """Atomically replace the Parquet sidecar; the sidecar is only a speed-up, so failures are ignored."""
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix=".parquet.tmp", dir=os.path.dirname(os.path.abspath(parquet_path)))
+        os.close(fd)
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, parquet_path)
+    except (ImportError, OSError, TypeError, ValueError):
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@st.cache_data(show_spinner=False)
+def load_leave(path, mtime):
+    """Read and preprocess the leave sheet; mtime keys the cache so edits invalidate it."""
+    # Prefer the Parquet sidecar when it is newer than the workbook
+    parquet_path = os.path.splitext(path)[0] + ".parquet"
+    df = None
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= mtime:
+        try:
+            df = pd.read_parquet(parquet_path, engine="pyarrow")
+        except Exception:
+            df = None  # Corrupt or unreadable sidecar; rebuild it from the workbook
+
+    if df is None:
+        try:
+            df = pd.read_excel(path, dtype=leave_dtypes, parse_dates=date_columns)
+        except ValueError:
+            # parse_dates rejects missing columns; re-read untyped so the caller can report them
+            df = pd.read_excel(path)
+            if required_columns.issubset(df.columns):
+                raise
+        write_sidecar(df, parquet_path)
+
+    # Leave validation (and reporting) to the caller
+    if not required_columns.issubset(df.columns):
+        return df
+
+    # No-op when the types already match; upgrades sidecars written before they were declared
+    df = df.astype(leave_dtypes)
+
+    # Calculate working days (Monday-Friday) in one vectorized call
+    start_days = df['Start_Date'].values.astype('datetime64[D]')
+    end_days = df['End_Date'].values.astype('datetime64[D]')
+    df['Working Days'] = working_days(start_days, end_days)
+
+    # Calculate Leave Duration in Days
+    df['Leave_Duration'] = df['Working Days'] + 1
+
+    # Extract Month Number from Start_Date
+    df['Month_Num'] = df['Start_Date'].dt.month.astype('int8')
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def filter_options(path, mtime):
+    """Employee and leave type choices for the sidebar, built once per dataset load."""
+    df = load_leave(path, mtime)
+    employees = sorted(df['Employee_Name'].dropna().unique().tolist())
+    leave_types = df['Reason'].dropna().unique().tolist()
+    return employees, leave_types
+
+
+@st.cache_data(show_spinner=False)
+def build_cube(path, mtime):
+    """Leave count and days per (employee, month, reason); every summary is sliced from this."""
+    df = load_leave(path, mtime)
+    # dropna=False keeps rows with a blank Employee_Name in the totals, as the raw table does
+    return df.groupby(['Employee_Name', 'Month_Num', 'Reason'], observed=True, dropna=False).agg(
+        count=('Leave_Duration', 'size'),
+        days=('Leave_Duration', 'sum'),
+    ).reset_index()
+
+
+# Convert to DataFrame
+datafile_mtime = os.path.getmtime(datafile)
+leave_df = load_leave(datafile, datafile_mtime)
+
+if not required_columns.issubset(leave_df.columns):
+    st.error(f"Error: Missing required columns: {required_columns - set(leave_df.columns)}")
+    st.stop()
 
 # Sidebar Filters
-selected_employee = st.sidebar.selectbox("Select Employee", ["All"] + sorted(leave_df["Employee_Name"].dropna().unique()))
-selected_leave_types = st.sidebar.multiselect("Select Leave Type", leave_df["Reason"].dropna().unique(), default=leave_df["Reason"].dropna().unique())
+employees, leave_types = filter_options(datafile, datafile_mtime)
+selected_employee = st.sidebar.selectbox("Select Employee", ["All"] + employees)
+selected_leave_types = st.sidebar.multiselect("Select Leave Type", leave_types, default=leave_types)
+
 
-# Apply filters
-filtered_df = leave_df[
-    ((leave_df['Employee_Name'] == selected_employee) | (selected_employee == "All")) &
-    (leave_df['Reason'].isin(selected_leave_types))
-]
+def filter_mask(df, employee, leave_types):
+    """Rows matching the sidebar filters, skipping the employee comparison when "All" is selected."""
+    mask = df['Reason'].isin(leave_types).values
+    if employee != "All":
+        mask = mask & (df['Employee_Name'] == employee).values
+    return mask
+
+
+# Apply filters; the summaries below aggregate the small filtered cube, not the raw rows
+leave_cube = build_cube(datafile, datafile_mtime)
+filtered_cube = leave_cube[filter_mask(leave_cube, selected_employee, selected_leave_types)]
 
 # Streamlit app layout
 st.title("📊 Customer Service Leave Trend Analysis by Month & Type")
@@ -63,14 +139,20 @@ This dashboard visualizes the number of leave applications per month, categorize
 It helps HR track trends and manage leave planning.
 """)
 
+# Nothing below is worth computing when the filters match no records
+if filtered_cube.empty:
+    st.warning("⚠️ No records match the current filters.")
+    st.stop()
+
 # Display filtered data table
+filtered_df = leave_df[filter_mask(leave_df, selected_employee, selected_leave_types)]
 with st.expander("📋 View Filtered Leave Data"):
     st.dataframe(filtered_df)
 
 # Calculate key leave metrics
-total_leaves = len(filtered_df)
-total_leave_days = filtered_df['Leave_Duration'].sum() if total_leaves > 0 else 0
-average_leave_days = round(filtered_df['Leave_Duration'].mean(), 2) if total_leaves > 0 else 0
+total_leaves = int(filtered_cube['count'].sum())
+total_leave_days = filtered_cube['days'].sum()
+average_leave_days = round(total_leave_days / total_leaves, 2)
 
 # Layout for displaying metrics
 col1, col2, col3 = st.columns(3)
@@ -79,148 +161,123 @@ col2.metric(label="📅 Total Leave Days", value=total_leave_days)
 col3.metric(label="📊 Avg Leave Duration (Days)", value=average_leave_days)
 
 st.subheader("Leave summary")
-leave_status_summary = filtered_df['Reason'].value_counts()
+leave_status_summary = filtered_cube.groupby('Reason', observed=True)['count'].sum().sort_values(ascending=False)
 
 
-total_leave = {
-    "Annual": leave_status_summary.get("Annual Leave", 0),
-    "Sick": leave_status_summary.get("Sick Leave", 0),
-     "Study": leave_status_summary.get("Study Leave", 0),
-    "Casual": leave_status_summary.get("Casual Leave", 0),
-    "Maternity": leave_status_summary.get("Maternity Leave", 0),
-    "Paternity": leave_status_summary.get("Paternity Leave", 0)
-}
+# Leave types always shown in the summary, even when none were taken
+leave_labels = ['Annual Leave', 'Sick Leave', 'Study Leave', 'Casual Leave', 'Maternity Leave', 'Paternity Leave']
+total_leave = leave_status_summary.reindex(leave_labels, fill_value=0)
 
 st.subheader("Leave Summary by Type")
-st.write(f"**Total Annual Leave**: {total_leave['Annual']}")
-st.write(f"**Total Sick Leave**: {total_leave['Sick']}") 
-st.write(f"**Total Study Leave**: {total_leave['Study']}") 
-st.write(f"**Total Casual Leave**: {total_leave['Casual']}")
-st.write(f"**Total Maternity Leave**: {total_leave['Maternity']}")
-st.write(f"**Total Paternity Leave**: {total_leave['Paternity']}")
-
-
+st.table(total_leave.rename_axis('Leave Type').rename('Count'))
 
 
 # --- Leave Trend by Month ---
-leave_trend = filtered_df.groupby(['Month_Name', 'Reason']).size().reset_index(name='Leave_Count')
-
-
-if not leave_trend.empty:
-    leave_pivot = leave_trend.pivot(index='Month_Name', columns='Reason', values='Leave_Count').fillna(0)
-
-    st.subheader("📈 Leave Trend by Month & Type")
-    fig, ax = plt.subplots(figsize=(10, 5))
-    leave_pivot.plot(kind='bar', stacked=True, colormap='Set2', ax=ax)
-
-    ax.set_xlabel("Month")
-    ax.set_ylabel("Number of Leave Applications")
-    ax.set_title(f"Leave Trend by Month & Type ({selected_employee})")
-    ax.legend(title="Reason")
-    ax.set_xticklabels(ax.get_xticklabels(), rotation=45)
-    ax.grid(axis='y', linestyle='--', alpha=0.7)
-    st.pyplot(fig)
-
-    # --- Heatmap for Monthly Leave Trends ---
-    st.subheader("🔥 Monthly Leave Trend Heatmap")
-    heatmap_data = filtered_df.groupby(['Month_Name', 'Reason'])['Leave_Duration'].sum().unstack().fillna(0)
-
-    fig, ax = plt.subplots(figsize=(10, 5))
-    sns.heatmap(heatmap_data, cmap="Blues", annot=True, fmt=".1f", linewidths=0.5, ax=ax)
-    ax.set_title("Total Leave Days by Month & Type")
-    st.pyplot(fig)
-else:
-    st.warning("⚠️ No data available for the selected filters.")
-
-
-
-# Define the correct month order
-month_order = [
-    "January", "February", "March", "April", "May", "June",
-    "July", "August", "September", "October", "November", "December"
-]
-
-# Ensure 'Month_Name' is a categorical variable with the correct order
-leave_trend = filtered_df.groupby(['Employee_Name', 'Month_Name']).size().reset_index(name='Leave_Taken_Each_Month_By_Staff')
-
-# Group by Month to get total leave requests per month
-monthly_leave = leave_trend.groupby('Month_Name')['Leave_Taken_Each_Month_By_Staff'].sum().reset_index()
-
-# Convert 'Month_Name' to categorical and sort accordingly
-monthly_leave['Month_Name'] = pd.Categorical(monthly_leave['Month_Name'], categories=month_order, ordered=True)
-monthly_leave = monthly_leave.sort_values('Month_Name')
+# Charts are only built once the user switches them on inside their expander
+st.subheader("📈 Leave Trend by Month & Type")
+with st.expander("📈 View Leave Trend Chart"):
+    if st.toggle("Render bar chart", key="bar_chart"):
+        leave_pivot = filtered_cube.pivot_table(index='Month_Num', columns='Reason', values='count',
+                                                aggfunc='sum', fill_value=0, observed=True)
+        leave_pivot = leave_pivot.reindex(range(1, 13), fill_value=0)
+        leave_pivot.index = leave_pivot.index.map(month_names).rename('Month_Name')
+
+        # Long format for Altair; the chart is drawn client-side from the data
+        bar_data = leave_pivot.melt(var_name='Reason', value_name='Leave_Count', ignore_index=False).reset_index()
+        bar_chart = alt.Chart(bar_data).mark_bar().encode(
+            x=alt.X('Month_Name:N', sort=month_order, title="Month", axis=alt.Axis(labelAngle=-45)),
+            y=alt.Y('Leave_Count:Q', stack='zero', title="Number of Leave Applications"),
+            color=alt.Color('Reason:N', scale=alt.Scale(scheme='set2'), title="Reason"),
+            tooltip=['Month_Name', 'Reason', 'Leave_Count'],
+        ).properties(title=f"Leave Trend by Month & Type ({selected_employee})")
+        st.altair_chart(bar_chart, use_container_width=True)
+
+# --- Heatmap for Monthly Leave Trends ---
+st.subheader("🔥 Monthly Leave Trend Heatmap")
+with st.expander("🔥 View Leave Heatmap"):
+    if st.toggle("Render heatmap", key="heatmap"):
+        heatmap_data = filtered_cube.pivot_table(index='Month_Num', columns='Reason', values='days',
+                                                 aggfunc='sum', fill_value=0, observed=True)
+        heatmap_data = heatmap_data.reindex(range(1, 13), fill_value=0)
+        heatmap_data.index = heatmap_data.index.map(month_names).rename('Month_Name')
+
+        heat_data = heatmap_data.melt(var_name='Reason', value_name='Leave_Days', ignore_index=False).reset_index()
+        heat_base = alt.Chart(heat_data).encode(
+            x=alt.X('Reason:N', title="Reason"),
+            y=alt.Y('Month_Name:N', sort=month_order, title="Month"),
+        )
+        heat_cells = heat_base.mark_rect(stroke='white', strokeWidth=0.5).encode(
+            color=alt.Color('Leave_Days:Q', scale=alt.Scale(scheme='blues'), title="Leave Days"),
+            tooltip=['Month_Name', 'Reason', alt.Tooltip('Leave_Days:Q', format='.1f')],
+        )
+        heat_labels = heat_base.mark_text(baseline='middle').encode(text=alt.Text('Leave_Days:Q', format='.1f'))
+        heatmap = (heat_cells + heat_labels).properties(title="Total Leave Days by Month & Type")
+        st.altair_chart(heatmap, use_container_width=True)
+
+
+
+# Group by Month to get total leave requests per month, in calendar order
+monthly_leave = filtered_cube.groupby('Month_Num', observed=True)['count'].sum().reindex(range(1, 13), fill_value=0)
+
+# Map month numbers to names for display
+monthly_leave.index = monthly_leave.index.map(month_names).rename('Month_Name')
 
 # Display results
 st.subheader('Determine the month with the highest number of leave requests')
-st.table(monthly_leave)
+st.table(monthly_leave.rename('Leave_Count'))
 
 
 
 # ---- Leave Type Breakdown (Pie Chart) ----
 st.subheader("📊 Leave Type Breakdown")
-if not leave_status_summary.empty:
-
-    fig, ax = plt.subplots()
-    colors = sns.color_palette("Set2", len(leave_status_summary))
-    pd.Series(leave_status_summary).plot(kind='pie', autopct='%1.1f%%', startangle=90, colors=colors, ax=ax)
-    ax.set_ylabel("")
-    ax.set_title("Percentage of Leave Types")
-    st.pyplot(fig)
-
-else:
-    st.warning("⚠️ No leave data available for pie chart.")    
+with st.expander("📊 View Leave Type Pie Chart"):
+    if st.toggle("Render pie chart", key="pie_chart"):
+        fig, ax = plt.subplots()
+        try:
+            colors = sns.color_palette("Set2", len(leave_status_summary))
+            pd.Series(leave_status_summary).plot(kind='pie', autopct='%1.1f%%', startangle=90, colors=colors, ax=ax)
+            ax.set_ylabel("")
+            ax.set_title("Percentage of Leave Types")
+            st.pyplot(fig)
+        finally:
+            plt.close(fig)  # pyplot keeps every open figure alive across reruns otherwise
 
 # ---- Leave Distribution by Employee ----
-if not filtered_df.empty:
-    leave_distribution = filtered_df.groupby(['Reason', 'Employee_Name'])['Leave_Duration'].sum().reset_index().sort_values('Leave_Duration')
-    
-    st.subheader("📊 Leave Distribution by Type & Employee")
-    # st.write(leave_distribution)
+leave_distribution = filtered_cube.groupby(['Reason', 'Employee_Name'], observed=True)['days'].sum()
+leave_distribution = leave_distribution.rename('Leave_Duration').sort_values()
 
-    with st.expander("📋 View Leave Breakdown by Employee"):
-        st.write(leave_distribution)
-else:
-    st.warning("⚠️ No data available for leave distribution.")
+st.subheader("📊 Leave Distribution by Type & Employee")
+# st.write(leave_distribution)
 
+with st.expander("📋 View Leave Breakdown by Employee"):
+    st.write(leave_distribution)
 
-leave_counts = leave_df['Employee_Name'].value_counts()
 
-# Get the employee with the highest leave count
-top_employee = leave_counts.idxmax()  # Employee with most leaves
-top_leave_count = leave_counts.max()  # Number of leaves taken
+# Count the number of leaves taken by each employee under the current filters
+leave_counts = filtered_cube.groupby('Employee_Name', observed=True)['count'].sum().sort_values(ascending=False)
+leave_counts = leave_counts.rename('Leave_Applications')
 
-st.subheader("🏆 Employee with Most Leave")
-st.write(f"**{top_employee}** has taken the most leave, with **{top_leave_count}** applications.")
+# Get the employees with the highest and least leave count
+top_employee, least_employee = leave_counts.idxmax(), leave_counts.idxmin()
 
-# Display full leave count table
-with st.expander("📋 View Leave Counts for All Employees"):
-    st.write(leave_counts)
-
-
-# Count the number of leaves taken by each employee
-leave_counts = leave_df['Employee_Name'].value_counts()
-
-# Get the employee with the least leave count
-least_employee = leave_counts.idxmin()  # Employee with least leaves
-least_leave_count = leave_counts.min()  # Minimum number of leaves taken
-
-st.subheader("🥇 Employee with Least Leave")
-st.write(f"**{least_employee}** has taken the least leave, with **{least_leave_count}** application(s).")
+st.subheader("🏆 Employees with Most & Least Leave Applications")
+col1, col2 = st.columns(2)
+col1.metric(label="🏆 Most Leave", value=f"{top_employee} ({leave_counts.max()})")
+col2.metric(label="🥇 Least Leave", value=f"{least_employee} ({leave_counts.min()})")
 
 # Display full leave count table
 with st.expander("📋 View Leave Counts for All Employees"):
-    st.write(leave_counts)    
+    st.dataframe(leave_counts)
 
 
- # Calculate total leave days for each employee
-leave_df['Leave_Duration'] = (leave_df['End_Date'] - leave_df['Start_Date']).dt.days + 1
-leave_summary = leave_df.groupby('Employee_Name')['Leave_Duration'].sum().reset_index()
+# Calculate total leave days for each employee
+leave_summary = leave_cube.groupby('Employee_Name', observed=True)['days'].sum().rename('Leave_Duration')
 
 # Get the top 5 employees with the most leave taken
-top_5_most_leave = leave_summary.nlargest(5, 'Leave_Duration')
+top_5_most_leave = leave_summary.nlargest(5).reset_index()
 
 # Get the bottom 5 employees with the least leave taken
-bottom_5_least_leave = leave_summary.nsmallest(5, 'Leave_Duration')
+bottom_5_least_leave = leave_summary.nsmallest(5).reset_index()
 
 
 st.markdown(
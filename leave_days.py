@@ -0,0 +1,53 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; working days fall back to plain numpy
+    njit = None
+
+# Weekdays (Mon-Fri) in the partial week between a start and end weekday, Monday == 0
+busday_tail = np.array([[sum((s + k) % 7 < 5 for k in range((e - s) % 7)) for e in range(7)]
+                        for s in range(7)], dtype=np.int8)
+
+# Sheets at least this long use the numba kernel (when installed) for working days
+numba_min_rows = 100_000
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _busday_count_kernel(start, end, tail):
+        """Mon-Fri day counts between int64 day-epoch arrays, matching np.busday_count.
+
+        NaT is not checked here; working_days rejects it before dispatching.
+        """
+        out = np.empty(start.size, np.int64)
+        for i in prange(start.size):
+            s, e, sign = start[i], end[i], 1
+            if e < s:
+                # np.busday_count counts (end, begin] for backward ranges
+                s, e, sign = e + 1, s + 1, -1
+            out[i] = sign * ((e - s) // 7 * 5 + tail[(s + 3) % 7, (e + 3) % 7])
+        return out
+
+
+def working_days(start_days, end_days):
+    """Count Mon-Fri days for datetime64[D] arrays exactly as np.busday_count does.
+
+    Forward ranges count [start, end); backward ranges count (end, start] and are negative.
+    """
+    if np.isnat(start_days).any() or np.isnat(end_days).any():
+        raise ValueError("Start_Date and End_Date must be filled in for every leave record")
+
+    start = start_days.view('int64')
+    end = end_days.view('int64')
+    if njit is not None and start.size >= numba_min_rows:
+        return _busday_count_kernel(start, end, busday_tail)
+
+    # Backward ranges count (end, start], i.e. [end + 1, start + 1) negated
+    backward = end < start
+    lo = np.where(backward, end + 1, start)
+    hi = np.where(backward, start + 1, end)
+
+    # Whole weeks contribute 5 days each; the table covers the leftover days.
+    # 1970-01-01 was a Thursday, so (day + 3) % 7 gives Monday == 0.
+    counts = (hi - lo) // 7 * 5 + busday_tail[(lo + 3) % 7, (hi + 3) % 7]
+    return np.where(backward, -counts, counts)
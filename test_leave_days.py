@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import leave_days
+from leave_days import busday_tail, working_days
+
+
+def day_pairs():
+    """Every start/end weekday combination, forward and backward, plus random spans."""
+    monday = np.datetime64('2025-03-03')
+    start = monday + np.arange(-14, 14)
+    offsets = np.arange(-30, 31)
+    starts = np.repeat(start, offsets.size)
+    ends = starts + np.tile(offsets, start.size)
+
+    rng = np.random.default_rng(0)
+    rand_start = np.datetime64('2020-01-01') + rng.integers(0, 3000, 5000)
+    rand_end = rand_start + rng.integers(-400, 401, 5000)
+    return np.concatenate([starts, rand_start]), np.concatenate([ends, rand_end])
+
+
+def test_busday_tail_matches_numpy():
+    monday = np.datetime64('2025-03-03')
+    for s in range(7):
+        for e in range(7):
+            start = monday + s
+            end = start + (e - s) % 7
+            assert busday_tail[s, e] == np.busday_count(start, end)
+
+
+def test_working_days_matches_busday_count():
+    start, end = day_pairs()
+    np.testing.assert_array_equal(working_days(start, end), np.busday_count(start, end))
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    ('2025-03-03', '2025-03-09', 5),    # Monday to Sunday
+    ('2025-03-09', '2025-03-03', -4),   # backward: counts (end, start]
+    ('2025-03-08', '2025-03-09', 0),    # Saturday to Sunday
+    ('2025-03-09', '2025-03-08', 0),    # Sunday back to Saturday
+    ('2025-03-10', '2025-03-08', -1),   # Monday back to Saturday
+    ('2025-03-07', '2025-03-07', 0),    # empty range
+])
+def test_working_days_edge_cases(start, end, expected):
+    result = working_days(np.array([start], 'datetime64[D]'), np.array([end], 'datetime64[D]'))
+    assert result[0] == expected == np.busday_count(start, end)
+
+
+def test_working_days_rejects_nat():
+    start = np.array(['2025-03-03', 'NaT'], 'datetime64[D]')
+    end = np.array(['2025-03-07', '2025-03-07'], 'datetime64[D]')
+    with pytest.raises(ValueError):
+        working_days(start, end)
+
+
+@pytest.mark.skipif(leave_days.njit is None, reason="numba is not installed")
+def test_numba_kernel_matches_busday_count(monkeypatch):
+    monkeypatch.setattr(leave_days, 'numba_min_rows', 0)
+    start, end = day_pairs()
+    np.testing.assert_array_equal(working_days(start, end), np.busday_count(start, end))